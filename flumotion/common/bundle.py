@@ -335,12 +335,14 @@ class BundlerBasket:
         @type dependencies: list of strings
         """
         # note that a bundler doesn't necessarily need to be registered yet
-        if not self._graph.hasNode(depender):
-            self._graph.addNode(depender)
+        graph = self._graph
+        if not graph.hasNode(depender):
+            graph.addNode(depender)
         for dep in dependencies:
-            if not self._graph.hasNode(dep):
-                self._graph.addNode(dep)
-            self._graph.addEdge(depender, dep)
+            if not graph.hasNode(dep):
+                graph.addNode(dep)
+            if not graph.hasEdge(depender, dep):
+                graph.addEdge(depender, dep)
 
     def getDependencies(self, bundlerName):
         """
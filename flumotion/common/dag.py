@@ -36,9 +36,10 @@ class Node:
     I am private to the Graph.
     """
 
-    def __init__(self, object, type=0):
+    def __init__(self, object, objtype=0):
         self.object = object
-        self.type = type
+        self.type = objtype
+        self.key = (object, objtype) # shared by every lookup returning us
         self.parents = []   # FIXME: could be weakrefs to avoid cycles ?
         self.children = []
 
@@ -46,11 +47,7 @@ class Node:
         """
         Returns whether the node is floating: no parents and no children.
         """
-        count = len(self.children) + len(self.parents)
-        if count:
-            return False
-
-        return True
+        return not (self.children or self.parents)
 
 
 class DAG(log.Loggable):
@@ -62,71 +59,82 @@ class DAG(log.Loggable):
     """
 
     def __init__(self):
-        self._nodes = {} # map of (object, type) -> NodeX
+        self._nodes = {} # map of type -> (map of object -> Node)
         self._tainted = False # True after add/remove and no cycle check done
+        self._sorted = [] # last result of _sortPreferred(), valid if untainted
+        self._offspring = {} # (object, type, types) -> offspring list
 
         # topological sort stuff
         self._count = 0
         self._begin = {} # node -> begin count
         self._end = {} # node -> end count
-        self._hasZeroEnd = [] # list of nodes that have end set to zero
-
-    def _assertExists(self, object, type=0):
-        if not self.hasNode(object, type):
-            raise KeyError("No node for object %r, type %r" % (object, type))
 
-    def addNode(self, object, type=0):
+    def addNode(self, object, objtype=0):
         """
         I add a node to the DAG.
 
         @param object: object to put in the DAG
-        @param type:   optional type for the object
+        @param objtype: optional type for the object
         """
-        if self.hasNode(object, type):
+        if self.hasNode(object, objtype):
             raise KeyError("Node for %r already exists with type %r" % (
-                object, type))
+                object, objtype))
 
-        n = Node(object, type)
-        self._nodes[(object, type)] = n
+        n = Node(object, objtype)
+        self._nodes.setdefault(objtype, {})[object] = n
+        self._changed()
 
-    def hasNode(self, object, type=0):
+    def hasNode(self, object, objtype=0):
         """
         I check if a node exists in the DAG.
 
         @param object: The object to check existence of.
-        @param type: An optional type for the object to check.
-        @type type: Integer
+        @param objtype: An optional type for the object to check.
+        @type objtype: Integer
 
         @rtype: Boolean
         """
-        if (object, type) in self._nodes.keys():
-            return True
-        return False
+        return object in self._nodes.get(objtype, ())
 
-    def removeNode(self, object, type=0):
+    def removeNode(self, object, objtype=0):
         """
         I remove a node that exists in the DAG.  I also remove any edges
-        pointing to this node.
+        pointing to or from this node.
 
         @param object: The object to remove.
-        @param type: The type of object to remove (optional).
+        @param objtype: The type of object to remove (optional).
         """
-        if not self.hasNode(object, type):
-            raise KeyError("Node for %r with type %r does not exist" % (
-                object, type))
-        node = self._getNode(object, type)
-        self.debug("Removing node (%r, %r)" % (object, type))
-        # go through all the nodes and remove edges that end in this node
-        for somenodeobj, somenodetype in self._nodes:
-            somenode = self._nodes[(somenodeobj, somenodetype)]
-            if node in somenode.children:
-                self.removeEdge(somenodeobj, object, somenodetype, type)
-
-        del self._nodes[(object, type)]
+        node = self._getNode(object, objtype)
+        self.debug("Removing node (%r, %r)", object, objtype)
+        # go through our parents and children and remove edges that end
+        # or start in this node
+        for parent in node.parents[:]:
+            self.removeEdge(parent.object, object, parent.type, objtype)
+        for child in node.children[:]:
+            self.removeEdge(object, child.object, objtype, child.type)
+
+        nodes = self._nodes[objtype]
+        del nodes[object]
+        if not nodes:
+            del self._nodes[objtype]
+        self._changed()
+
+    def _getNode(self, object, objtype=0):
+        try:
+            return self._nodes[objtype][object]
+        except KeyError:
+            raise KeyError("No node for object %r, type %r" % (
+                object, objtype))
+
+    def _changed(self):
+        self._tainted = True
+        self._offspring.clear()
 
-    def _getNode(self, object, type=0):
-        value = self._nodes[(object, type)]
-        return value
+    def _getAllNodes(self):
+        ret = []
+        for nodes in self._nodes.values():
+            ret.extend(nodes.values())
+        return ret
 
     def addEdge(self, parent, child, parenttype=0, childtype=0):
         """
@@ -137,8 +145,6 @@ class DAG(log.Loggable):
         @param parenttype: The type of the parent object (optional).
         @param childtype: The type of the child object (optional).
         """
-        self._assertExists(parent, parenttype)
-        self._assertExists(child, childtype)
         np = self._getNode(parent, parenttype)
         nc = self._getNode(child, childtype)
 
@@ -147,10 +153,26 @@ class DAG(log.Loggable):
                 "%r of type %r is already a child of %r of type %r" % (
                     child, childtype, parent, parenttype))
 
-        self._tainted = True
+        self._changed()
         np.children.append(nc)
         nc.parents.append(np)
 
+    def hasEdge(self, parent, child, parenttype=0, childtype=0):
+        """
+        I check if an edge exists between two nodes in the DAG.
+
+        @param parent: The object that is the parent.
+        @param child: The object that is the child.
+        @param parenttype: The type of the parent object (optional).
+        @param childtype: The type of the child object (optional).
+
+        @rtype: Boolean
+        """
+        np = self._getNode(parent, parenttype)
+        nc = self._getNode(child, childtype)
+
+        return nc in np.children
+
     def removeEdge(self, parent, child, parenttype=0, childtype=0):
         """
         I remove an edge between two nodes in the DAG.
@@ -160,18 +182,16 @@ class DAG(log.Loggable):
         @param parenttype: The type of the parent object (optional).
         @param childtype: The type of the child object (optional).
         """
-        self._assertExists(parent, parenttype)
-        self._assertExists(child, childtype)
-        np = self._nodes[(parent, parenttype)]
-        nc = self._nodes[(child, childtype)]
+        np = self._getNode(parent, parenttype)
+        nc = self._getNode(child, childtype)
 
         if nc not in np.children:
             raise KeyError("%r is not a child of %r" % (child, parent))
-        self.debug("Removing edge (%r ,%r) -> (%r, %r)" % (parent, parenttype,
-            child, childtype))
-        self._tainted = True
+        self.debug("Removing edge (%r ,%r) -> (%r, %r)", parent, parenttype,
+            child, childtype)
+        self._changed()
         np.children.remove(nc)
-        self.log("Children now: %r" % np.children)
+        self.log("Children now: %r", np.children)
         nc.parents.remove(np)
 
     def getChildrenTyped(self, object, objtype=0, types=None):
@@ -187,14 +207,10 @@ class DAG(log.Loggable):
 
         @rtype: list of (object, object)
         """
-        self._assertExists(object, objtype)
         node = self._getNode(object, objtype)
 
-        l = node.children
-        if types:
-            l = [n for n in l if n.type in types]
-
-        return [(n.object, n.type) for n in l]
+        return [n.key for n in node.children
+                if not types or n.type in types]
 
     def getChildren(self, object, objtype=0, types=None):
         """
@@ -228,14 +244,10 @@ class DAG(log.Loggable):
 
         @rtype: list of (object, object)
         """
-        self._assertExists(object, objtype)
         node = self._getNode(object, objtype)
 
-        l = node.parents
-        if types:
-            l = [n for n in l if n.type in types]
-
-        return [(n.object, n.type) for n in l]
+        return [n.key for n in node.parents
+                if not types or n.type in types]
 
     def getParents(self, object, objtype=0, types=None):
         """
@@ -267,9 +279,12 @@ class DAG(log.Loggable):
 
         @rtype: list of (object,Integer)
         """
-        self._assertExists(object, objtype)
+        key = (object, objtype, types)
+        if key in self._offspring:
+            return self._offspring[key][:]
+
         node = self._getNode(object, objtype)
-        self.log("Getting offspring for (%r, %r)" % (object, objtype))
+        self.log("Getting offspring for (%r, %r)", object, objtype)
         # if we don't have children, don't bother trying
         if not node.children:
             self.log("Returning nothing")
@@ -278,35 +293,23 @@ class DAG(log.Loggable):
         # catches CycleError as well
         sortedNodes = self._sortPreferred()
 
-        # start by adding our node to our to be expanded list
-        nodeList = [node]
-        offspring = []
-        expand = True
-        # as long as we need to expand, loop over all offspring ...
-        while expand:
-            expand = False
-            for n in nodeList:
-                if n.children:
-                    # .. and for every item add all of its children
-                    # which triggers requiring further expansion
-                    expand = True
-                    nodeList.remove(n)
-                    nodeList.extend(n.children)
-                    offspring.extend(n.children)
-
-        # filter offspring by types
-        if types:
-            offspring = [n for n in offspring if n.type in types]
-
-        # now that we have all offspring, return a sorted list of them
-        ret = []
-        for n in sortedNodes:
-            if n in offspring:
-                ret.append((n.object, n.type))
+        # walk down from our node once, collecting every node we reach
+        offspring = set()
+        nodeList = list(node.children)
+        while nodeList:
+            n = nodeList.pop()
+            if n not in offspring:
+                offspring.add(n)
+                nodeList.extend(n.children)
 
-        for node in ret:
-            self.log("Offspring: (%r, %r)" % (node[0], node[1]))
-        return ret
+        # now that we have all offspring, return a sorted list of the ones
+        # matching the requested types
+        ret = [n.key for n in sortedNodes
+               if n in offspring and (not types or n.type in types)]
+
+        self.log("Offspring: %r", ret)
+        self._offspring[key] = ret
+        return ret[:]
 
     def getOffspring(self, object, objtype=0, *types):
         """
@@ -323,10 +326,7 @@ class DAG(log.Loggable):
 
         typedoffspring = self.getOffspringTyped(object, objtype, *types)
 
-        ret = []
-        ret = [n[0] for n in typedoffspring]
-
-        return ret
+        return [n[0] for n in typedoffspring]
 
     def getAncestorsTyped(self, object, objtype=0, *types):
         """
@@ -340,7 +340,6 @@ class DAG(log.Loggable):
 
         @rtype: list of (object,Integer)
         """
-        self._assertExists(object, objtype)
         node = self._getNode(object, objtype)
 
         # if we don't have children, don't bother trying
@@ -350,31 +349,19 @@ class DAG(log.Loggable):
         # catches CycleError as well
         sortedNodes = self._sortPreferred()
 
-        # start by adding our node to our to be expanded list
-        nodeList = [node]
-        ancestors = []
-        expand = True
-        # as long as we need to expand, loop over all offspring ...
-        while expand:
-            expand = False
-            for n in nodeList:
-                if n.parents:
-                    # .. and for every item add all of its children
-                    # which triggers requiring further expansion
-                    expand = True
-                    nodeList.remove(n)
-                    nodeList.extend(n.parents)
-                    ancestors.extend(n.parents)
-
-        # filter offspring by types
-        if types:
-            ancestors = [n for n in ancestors if n.type in types]
-
-        # now that we have all offspring, return a sorted list of them
-        ret = []
-        for n in sortedNodes:
-            if n in ancestors:
-                ret.append((n.object, n.type))
+        # walk up from our node once, collecting every node we reach
+        ancestors = set()
+        nodeList = list(node.parents)
+        while nodeList:
+            n = nodeList.pop()
+            if n not in ancestors:
+                ancestors.add(n)
+                nodeList.extend(n.parents)
+
+        # now that we have all ancestors, return a sorted list of the ones
+        # matching the requested types
+        ret = [n.key for n in sortedNodes
+               if n in ancestors and (not types or n.type in types)]
 
         return ret
 
@@ -391,10 +378,7 @@ class DAG(log.Loggable):
         """
         typedancestors = self.getAncestorsTyped(object, objtype, *types)
 
-        ret = []
-        ret = [n[0] for n in typedancestors]
-
-        return ret
+        return [n[0] for n in typedancestors]
 
     def isFloating(self, object, objtype=0):
         """
@@ -406,7 +390,6 @@ class DAG(log.Loggable):
 
         @rtype: Boolean
         """
-        self._assertExists(object, objtype)
         node = self._getNode(object, objtype)
 
         return node.isFloating()
@@ -425,7 +408,7 @@ class DAG(log.Loggable):
 
         @rtype: list of (object, type)
         """
-        return [(node.object, node.type) for node in self._sortPreferred()]
+        return [node.key for node in self._sortPreferred()]
 
     def _sortPreferred(self, list=None, clearState=True):
         """
@@ -437,20 +420,25 @@ class DAG(log.Loggable):
 
         @rtype: list of {Node}
         """
+        # only the default ordering is cached, and only as long as the
+        # graph did not change
+        cache = not list and clearState
+        if cache and not self._tainted:
+            return self._sorted
+
         self._count = 0
-        for n in self._nodes.values():
+        allNodes = self._getAllNodes()
+        for n in allNodes:
             self._begin[n] = 0
             self._end[n] = 0
-            if list:
-                assert (n.object, n.type) in list
         if list:
-            self._hasZeroEnd = [self._nodes[(n[0], n[1])] for n in list]
-        else:
-            self._hasZeroEnd = self._nodes.values()
+            assert len(set(list)) == len(allNodes)
+            allNodes = [self._getNode(n[0], n[1]) for n in list]
 
-        while self._hasZeroEnd:
-            node = self._hasZeroEnd[0]
-            self._dfs(node)
+        # start a search from every node not yet reached by a previous one
+        for node in allNodes:
+            if not self._begin[node]:
+                self._dfs(node)
 
         # get a list of dictionary keys sorted in decreasing value order
         l = []
@@ -462,8 +450,11 @@ class DAG(log.Loggable):
         if clearState:
             self._begin = {}
             self._end = {}
-            self._hasZeroEnd = []
-        return [node for count, node in l]
+        ret = [node for count, node in l]
+        if cache:
+            self._sorted = ret
+            self._tainted = False
+        return ret
 
     def _dfs(self, node):
         # perform depth first search
@@ -489,21 +480,14 @@ class DAG(log.Loggable):
 
         self._count += 1
         self._end[node] = self._count
-        if node in self._hasZeroEnd:
-            self._hasZeroEnd.remove(node)
 
-    def getAllNodesByType(self, type):
+    def getAllNodesByType(self, objtype):
         """
-        I return all the objects with node type specified by type
+        I return all the objects with node type specified by objtype
 
         @rtype: list of object
         """
-        ret = []
-        for node in self._nodes.keys():
-            if node[1] == type:
-                ret.append(self._nodes[node].object)
-
-        return ret
+        return self._nodes.get(objtype, {}).keys()
 
 
 def topological_sort(items, partial_order):
@@ -518,9 +502,11 @@ def topological_sort(items, partial_order):
     """
 
     graph = DAG()
+    addNode = graph.addNode
     for v in items:
-        graph.addNode(v)
+        addNode(v)
+    addEdge = graph.addEdge
     for a, b in partial_order:
-        graph.addEdge(a, b)
+        addEdge(a, b)
 
     return [v for v, t in graph.sort()]
@@ -53,6 +53,7 @@ class PropertiesAdminGtkNode(BaseAdminGtkNode):
         self.widget.pack_start(self.properties, False, False)
         self.properties.show()
 
+        self._properties = {}
         self._reloadProperties(self.state.get('config')['properties'])
         return self.widget
 
@@ -65,12 +66,14 @@ class PropertiesAdminGtkNode(BaseAdminGtkNode):
     ### Private methods
 
     def _reloadProperties(self, properties):
-        if properties is None:
+        # stateSet can hand us the same properties again; don't rebuild
+        # the list in that case
+        if properties is None or properties == self._properties:
             return
-        self.properties.clear()
-        propertyNames = properties.keys()[:]
-        propertyNames.sort()
+        self._properties = dict(properties)
 
-        for name in propertyNames:
-            self.properties.append(
-                Settable(name=name, value=properties[name]))
+        # add_list clears the list and loads all rows in one go, instead
+        # of updating the view for every appended row
+        self.properties.add_list(
+            [Settable(name=name, value=properties[name])
+             for name in sorted(properties)])
@@ -263,6 +263,8 @@ class TestBundlerBasket(testsuite.TestCase):
         basket.depend('leg', 'foot')
         basket.depend('arm', 'hand')
         basket.depend('body', 'leg', 'arm')
+        # declaring a dependency again is harmless
+        basket.depend('leg', 'foot')
         for i in 'leg', 'foot', 'arm', 'hand', 'body':
             basket._bundlers[i] = True
         deps = basket.getDependencies('body')
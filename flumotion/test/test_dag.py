@@ -67,6 +67,10 @@ class TestDAG(testsuite.TestCase):
         self.assertRaises(KeyError, graph.addEdge, 'adam', 'cain')
         self.assertRaises(KeyError, graph.addEdge, 'abraham', 'cain')
 
+        self.failUnless(graph.hasEdge('adam', 'cain'))
+        self.failIf(graph.hasEdge('cain', 'adam'))
+        self.assertRaises(KeyError, graph.hasEdge, 'abraham', 'cain')
+
         self.failIf(graph.isFloating('adam'))
         self.failIf(graph.isFloating('abel'))
 
@@ -153,6 +157,62 @@ class TestDAG(testsuite.TestCase):
         # make sure we have only one C and the three B's
         self.assertEquals(len(offspring), 4)
 
+    def testRemoveNode(self):
+        graph = dag.DAG()
+
+        graph.addNode('A')
+        graph.addNode('B1')
+        graph.addNode('B2')
+        graph.addNode('C')
+
+        graph.addEdge('A', 'B1')
+        graph.addEdge('A', 'B2')
+        graph.addEdge('B1', 'C')
+        graph.addEdge('B2', 'C')
+
+        graph.removeNode('C')
+        self.failIf(graph.hasNode('C'))
+        self.assertEquals(graph.getChildren('B1'), [])
+        self.assertEquals(graph.getChildren('B2'), [])
+        self.assertEquals(len(graph.getOffspring('A')), 2)
+
+        # remove a parent before its children
+        graph.removeNode('A')
+        self.failIf(graph.hasNode('A'))
+        self.assertEquals(graph.getParents('B1'), [])
+        self.failUnless(graph.isFloating('B2'))
+        graph.removeNode('B1')
+
+        # remove a child after its parent was removed and added again
+        graph.addNode('A')
+        graph.removeNode('B2')
+        self.failIf(graph.hasNode('B2'))
+        self.failUnless(graph.isFloating('A'))
+
+    def testOffspringChanges(self):
+        graph = dag.DAG()
+
+        graph.addNode('A')
+        graph.addNode('B')
+        graph.addEdge('A', 'B')
+        self.assertEquals(graph.getOffspring('A'), ['B'])
+
+        # changing the returned list does not affect the graph
+        graph.getOffspring('A').append('Z')
+        self.assertEquals(graph.getOffspring('A'), ['B'])
+
+        graph.addNode('C')
+        self.assertEquals(len(graph.sort()), 3)
+        graph.addEdge('C', 'A')
+        self.assertEquals(graph.sort(), [('C', 0), ('A', 0), ('B', 0)])
+        graph.removeEdge('C', 'A')
+        graph.addEdge('B', 'C')
+        self.assertEquals(graph.sort(), [('A', 0), ('B', 0), ('C', 0)])
+        self.assertEquals(graph.getOffspring('A'), ['B', 'C'])
+
+        graph.removeEdge('B', 'C')
+        self.assertEquals(graph.getOffspring('A'), ['B'])
+
 # example as shown in
 # http://www.cs.cornell.edu/courses/cs312/2004fa/lectures/lecture15.htm
 
@@ -188,7 +248,7 @@ class TestDAG(testsuite.TestCase):
         counts = [(1, 14), (2, 5), (3, 4), (6, 13), (8, 11), (7, 12),
                   (17, 18), (9, 10), (15, 16)]
         for i in range(1, 10):
-            n = graph._nodes[(i, 0)]
+            n = graph._getNode(i)
             begin, end = counts[i - 1]
             self.failUnless(n in graph._begin,
                 "n %r not in graph._begin %r" % (n, graph._begin))